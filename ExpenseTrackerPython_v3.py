@@ -12,10 +12,15 @@ Flexible Date Input
 '''
 
 
+import asyncio
 import os
+import re
+import threading
+import time
 from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
-import pandas as pd
+from pathlib import Path
+import numpy as np
+from PIL import Image, ImageDraw
 from io import BytesIO
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import (
@@ -32,18 +37,34 @@ from gspread.exceptions import WorksheetNotFound
 from dotenv import load_dotenv
 import json
 
-# --- Configuration ---
-SCOPE = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+# orjson decodes large payloads (every Sheets API response is JSON, often
+# hundreds of KB) several times faster than stdlib json. Route plain
+# json.loads calls through it so gspread's response parsing picks it up
+# too; anything exotic (or an environment without orjson) falls back to
+# the stdlib decoder.
+try:
+    import orjson
+except ImportError:
+    pass
+else:
+    _std_loads = json.loads
 
-# Load environment variables from .env file
-load_dotenv()
+    def _fast_loads(s, *args, **kwargs):
+        if args or kwargs:
+            return _std_loads(s, *args, **kwargs)
+        return orjson.loads(s)
 
-# --- Configuration (now loaded from environment) ---
-SCOPE = ["https://spreadsheets.google.com/feeds", 
+    json.loads = _fast_loads
+
+# --- Configuration (loaded from environment) ---
+SCOPE = ["https://spreadsheets.google.com/feeds",
          "https://www.googleapis.com/auth/drive"]
- # Keep this file secure
 
-GOOGLE_SHEETS_CREDENTIALS = os.getenv('GOOGLE_SHEETS_CREDENTIALS')
+# Load environment variables from the .env next to this script; the explicit
+# path skips dotenv's directory-walking search on every startup.
+load_dotenv(dotenv_path=Path(__file__).parent / '.env')
+
+GOOGLE_SHEETS_CREDENTIALS = os.getenv('GOOGLE_SHEETS_CREDENTIALS')  # Keep this secure
 SPREADSHEET_ID = os.getenv('SPREADSHEET_ID')
 TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
 
@@ -53,9 +74,60 @@ EXPENSES_SHEET = 'Expenses'
 SALARY_SHEET = 'Salary'
 PAYMENT_METHODS = ['Cash', 'UPI', 'Card', 'Bank Transfer', 'Other']
 
+# Expense message grammar: `[DD/MM] category amount [description] [via payment]`
+# compiled once so each message is parsed in a single regex pass instead of
+# repeated split/index/join calls.
+EXPENSE_RE = re.compile(
+    r'^(?:(?P<day>\d{1,2})/(?P<month>\d{1,2})\s+)?'
+    r'(?P<cat>\S+)\s+(?P<amt>\d+(?:\.\d+)?)'
+    r'(?:\s+(?P<desc>.*?))??'
+    r'(?:\s+via\s+(?P<pay>.+?))?\s*$',
+    re.IGNORECASE
+)
+
+# Case-insensitive payment-method resolution in one dict lookup.
+PAYMENT_LOOKUP = {method.lower(): method for method in PAYMENT_METHODS}
+
+# Containerized deployments restart often, and each restart pays ~500 ms of
+# TLS + JWT work for a fresh OAuth token. Cache the bearer token with its
+# expiry on disk and seed the credentials from it while it is still valid.
+# The file lives under the user's home (overridable via GSHEETS_TOKEN_CACHE),
+# is plain JSON — never unpickle from a shared path — and is created 0600
+# since it holds a live bearer token.
+TOKEN_CACHE_PATH = Path(os.getenv('GSHEETS_TOKEN_CACHE',
+                                  Path.home() / '.gsheets_token.json'))
+
+def load_cached_token(creds):
+    """Seed `creds` with a still-valid access token from a previous run."""
+    try:
+        with open(TOKEN_CACHE_PATH) as fh:
+            cached = json.load(fh)
+        token = cached['token']
+        expiry = datetime.fromisoformat(cached['expiry'])
+    except (OSError, ValueError, KeyError, TypeError):
+        return
+    if token and expiry - datetime.utcnow() > timedelta(minutes=5):
+        creds.access_token = token
+        creds.token_expiry = expiry
+
+def store_cached_token(creds):
+    """Persist the access token so the next restart can skip the OAuth flow."""
+    if not creds.access_token or not creds.token_expiry:
+        return
+    payload = json.dumps({'token': creds.access_token,
+                          'expiry': creds.token_expiry.isoformat()})
+    try:
+        fd = os.open(TOKEN_CACHE_PATH,
+                     os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as fh:
+            fh.write(payload)
+    except OSError:
+        pass
+
 # Initialize Google Sheets
-credentials_info = json.loads(os.getenv("GOOGLE_SHEETS_CREDENTIALS"))
+credentials_info = json.loads(GOOGLE_SHEETS_CREDENTIALS)
 credentials = ServiceAccountCredentials.from_json_keyfile_dict(credentials_info, SCOPE)
+load_cached_token(credentials)
 gc = gspread.authorize(credentials)
 
 def get_or_create_worksheet(spreadsheet, title, headers):
@@ -75,29 +147,296 @@ expenses_ws = get_or_create_worksheet(spreadsheet, EXPENSES_SHEET,
 salary_ws = get_or_create_worksheet(spreadsheet, SALARY_SHEET,
                                   ["Date", "Amount (₹)", "Description"])
 
+# --- Sheet Read Cache ---
+# Every command used to re-fetch the whole sheet over the network. Since the
+# sheets are append-only, we cache each worksheet's columns for a short TTL
+# and append new rows to the cached arrays ourselves after each write, so
+# most reads never touch the Google API at all.
+SHEET_CACHE_TTL = 30  # seconds
+
+_sheet_cache = {}  # cache key -> (fetch_timestamp, cached_value)
+
+# The authorized gspread client shares one requests session between the
+# event-loop thread and the executor threads (cold-cache fetches here, the
+# write flusher below), so every Sheets API call goes through this lock.
+_gspread_lock = threading.Lock()
+
+def _fetch_values(ws):
+    with _gspread_lock:
+        return ws.get_values()
+
+def _fetch_col_values(ws, col):
+    with _gspread_lock:
+        return ws.col_values(col)
+
+def _append_rows(ws, rows):
+    with _gspread_lock:
+        ws.append_rows(rows, value_input_option='USER_ENTERED')
+
+async def cached_columns(ws, ttl=SHEET_CACHE_TTL):
+    """Column arrays of `ws` (struct-of-arrays), cached for up to `ttl` seconds.
+
+    Column-major numpy arrays replace the old row-major rows: aggregations
+    become single vectorized passes instead of a dict lookup and type
+    conversion per row. Date is datetime64 and the amount column float64,
+    parsed once as rows enter the cache (numpy parses the ISO date strings
+    directly in C). The cold-cache fetch runs in a worker thread so it
+    never stalls the event loop.
+    """
+    key = f"{ws.title}:cols"
+    cached = _sheet_cache.get(key)
+    if cached is not None and time.time() - cached[0] < ttl:
+        return cached[1]
+    # get_values is one raw values_get; unlike get_all_records it skips
+    # gspread's per-row dict construction, and we go straight to columns.
+    values = await asyncio.get_running_loop().run_in_executor(
+        None, _fetch_values, ws)
+    if len(values) < 2:
+        cols = {}
+    else:
+        cols = {name: np.array(column, dtype=object)
+                for name, column in zip(values[0], zip(*values[1:]))}
+        cols['Date'] = cols['Date'].astype('datetime64[ns]')
+        cols['Amount (₹)'] = cols['Amount (₹)'].astype(np.float64)
+        if 'Category' in cols:
+            # Factorize categories once so every by-category rollup is a
+            # plain bincount over integer ids instead of a unique+sort pass.
+            cols['_cat_labels'], cols['_cat_ids'] = np.unique(
+                cols['Category'], return_inverse=True)
+    _sheet_cache[key] = (time.time(), cols)
+    return cols
+
+def sum_by(keys, amounts):
+    """Bucket `amounts` by `keys` in one vectorized pass (label -> total dict)."""
+    if len(keys) == 0:
+        return {}
+    labels, inverse = np.unique(keys, return_inverse=True)
+    return dict(zip(labels, np.bincount(inverse, weights=amounts)))
+
+def sum_by_category(cols, mask=None):
+    """By-category totals using the factorization maintained in the cache."""
+    ids = cols['_cat_ids']
+    amounts = cols['Amount (₹)']
+    if mask is not None:
+        ids = ids[mask]
+        amounts = amounts[mask]
+    labels = cols['_cat_labels']
+    totals = np.bincount(ids, weights=amounts, minlength=len(labels))
+    present = totals > 0  # keep only categories that occur in the selection
+    return dict(zip(labels[present], totals[present]))
+
+async def cached_amounts(ws, col, ttl=SHEET_CACHE_TTL):
+    """Amount column of `ws` as floats, fetched with col_values on a cold cache.
+
+    col_values pulls one column instead of every cell of every row, so a cold
+    balance check transfers a fraction of the bytes get_all_records would;
+    like cached_columns, the fetch itself runs off the event loop.
+    """
+    key = f"{ws.title}:amounts"
+    cached = _sheet_cache.get(key)
+    if cached is not None and time.time() - cached[0] < ttl:
+        return cached[1]
+    values = await asyncio.get_running_loop().run_in_executor(
+        None, _fetch_col_values, ws, col)
+    amounts = [float(v) for v in values[1:] if v]  # skip header
+    _sheet_cache[key] = (time.time(), amounts)
+    return amounts
+
+def cache_append(ws, record):
+    """Append a freshly written row to the cache so the next read is free."""
+    cached = _sheet_cache.get(f"{ws.title}:cols")
+    if cached is not None:
+        cols = cached[1]
+        if cols:
+            for name, value in record.items():
+                cols[name] = np.append(
+                    cols[name], np.array([value], dtype=cols[name].dtype))
+        else:
+            for name, value in record.items():
+                if name == 'Date':
+                    cols[name] = np.array([value], dtype='datetime64[ns]')
+                elif name == 'Amount (₹)':
+                    cols[name] = np.array([value], dtype=np.float64)
+                else:
+                    cols[name] = np.array([value], dtype=object)
+        if 'Category' in record:
+            # Keep the factorized ids aligned with the Category column.
+            if '_cat_labels' not in cols:
+                cols['_cat_labels'] = np.array([record['Category']], dtype=object)
+                cols['_cat_ids'] = np.array([0])
+            else:
+                found = np.flatnonzero(cols['_cat_labels'] == record['Category'])
+                if found.size:
+                    cat_id = found[0]
+                else:
+                    cat_id = len(cols['_cat_labels'])
+                    cols['_cat_labels'] = np.append(cols['_cat_labels'],
+                                                    record['Category'])
+                cols['_cat_ids'] = np.append(cols['_cat_ids'], cat_id)
+    amounts = _sheet_cache.get(f"{ws.title}:amounts")
+    if amounts is not None:
+        amounts[1].append(float(record['Amount (₹)']))
+
+# --- Background Write Queue ---
+# append_row is a 1-10 s Google API call; doing it inside the handler blocks
+# the reply (and the event loop) for every entry. Instead, handlers enqueue
+# rows and answer immediately (the cache above already holds the new row),
+# while a background task flushes the queue with a single append_rows call.
+FLUSH_INTERVAL = 2    # seconds between background flushes
+FLUSH_BATCH_SIZE = 20  # flush early once this many rows are buffered
+
+_write_queue = asyncio.Queue()
+
+async def queue_row(ws, row):
+    """Buffer a row for the background flusher instead of writing inline."""
+    await _write_queue.put((ws, row))
+
+def _drain_queue_batches():
+    """Group everything currently queued into per-worksheet batches."""
+    batches = {}
+    while not _write_queue.empty():
+        ws, row = _write_queue.get_nowait()
+        batches.setdefault(ws, []).append(row)
+    return batches
+
+async def flush_writes_task():
+    """Drain the write queue periodically and push each batch in one request."""
+    loop = asyncio.get_running_loop()
+    while True:
+        if _write_queue.qsize() < FLUSH_BATCH_SIZE:
+            await asyncio.sleep(FLUSH_INTERVAL)
+        batches = _drain_queue_batches()
+        flush_failed = False
+        for ws, rows in batches.items():
+            try:
+                await loop.run_in_executor(None, _append_rows, ws, rows)
+            except Exception as e:
+                # The user was already told the entry was recorded and the
+                # cache/totals include it, so a failed batch (a routine API
+                # 429, say) must not be dropped — re-enqueue it and retry
+                # on a later cycle.
+                for row in rows:
+                    _write_queue.put_nowait((ws, row))
+                flush_failed = True
+                print(f"Flush of {len(rows)} rows to {ws.title} failed, "
+                      f"will retry: {e}")
+        if flush_failed:
+            # Back off before retrying so a full queue can't hot-loop
+            # against an API that is rate-limiting us.
+            await asyncio.sleep(FLUSH_INTERVAL)
+
+# Amount column positions on each sheet (1-based, as gspread counts them).
+SALARY_AMOUNT_COL = 2
+EXPENSES_AMOUNT_COL = 3
+
+# --- Running Totals ---
+# balance = previous balance + delta, so rather than re-summing the whole
+# history on every command we keep the two totals in memory: seeded once
+# from the sheets at startup, then bumped as each new entry arrives.
+_totals = {}
+
+async def initialize_totals():
+    """Seed the running salary/expense totals from the sheets."""
+    _totals['salary'] = sum(await cached_amounts(salary_ws, SALARY_AMOUNT_COL))
+    _totals['expenses'] = sum(await cached_amounts(expenses_ws, EXPENSES_AMOUNT_COL))
+
+async def add_to_total(key, amount):
+    """Bump a running total for a freshly recorded entry."""
+    if not _totals:
+        await initialize_totals()
+    _totals[key] += amount
+
 # --- Helper Functions ---
-def calculate_balance():
+async def calculate_balance():
     """Calculate remaining balance after salary and expenses"""
-    salary_data = salary_ws.get_all_records()
-    salary_df = pd.DataFrame(salary_data)
-    total_salary = salary_df['Amount (₹)'].sum() if not salary_df.empty else 0
-    
-    expense_data = expenses_ws.get_all_records()
-    expense_df = pd.DataFrame(expense_data)
-    total_expenses = expense_df['Amount (₹)'].sum() if not expense_df.empty else 0
-    
-    return total_salary - total_expenses
+    if not _totals:
+        await initialize_totals()
+    return _totals['salary'] - _totals['expenses']
 
-def get_current_month_expenses():
-    """Get expenses for current month grouped by category"""
-    expense_data = expenses_ws.get_all_records()
-    if not expense_data:
-        return pd.DataFrame()
-    
-    df = pd.DataFrame(expense_data)
-    df['Date'] = pd.to_datetime(df['Date'])
-    current_month = pd.to_datetime('now').to_period('M')
-    return df[df['Date'].dt.to_period('M') == current_month]
+async def get_current_month_expenses():
+    """Get the current month's expense columns from the cache"""
+    cols = await cached_columns(expenses_ws)
+    if not cols:
+        return {}
+
+    # Backdated DD/MM entries are appended at the end of the sheet, so the
+    # Date column is not sorted and a binary-searched start index can skip
+    # earlier rows of the current month. One vectorized mask over the whole
+    # column (same as generate_report) is cheap and always correct.
+    month = np.datetime64(datetime.now().strftime('%Y-%m'))
+    mask = cols['Date'].astype('datetime64[M]') == month
+    if not mask.any():
+        return {}
+    return {name: column[mask] for name, column in cols.items()
+            if not name.startswith('_')}
+
+# --- Chart Rendering ---
+# A Telegram pie chart with a handful of slices does not need matplotlib
+# (~300 ms import, megabytes per savefig). These helpers draw the slices
+# directly with Pillow — a few ms and a few hundred KB — and still run in a
+# worker thread (run_in_executor) so handlers never block on rendering.
+PIE_COLORS = ['#4e79a7', '#f28e2b', '#e15759', '#76b7b2', '#59a14f',
+              '#edc949', '#b07aa1', '#ff9da7', '#9c755f', '#bab0ac']
+PIE_SIZE = 420  # width in px of a single chart panel
+
+def _draw_pie(title, totals, placeholder, size=PIE_SIZE):
+    """Draw one titled pie chart with a legend for a label -> amount dict."""
+    pad = 16
+    legend_height = 22 * len(totals)
+    img = Image.new('RGB', (size, size + 28 + legend_height + pad), 'white')
+    draw = ImageDraw.Draw(img)
+    draw.text((size / 2, 14), title, fill='black', anchor='mm')
+
+    if not totals:
+        draw.text((size / 2, size / 2), placeholder, fill='black', anchor='mm')
+        return img
+
+    total = float(sum(totals.values()))
+    bbox = (pad, 28, size - pad, 28 + size - 2 * pad)
+    angle = -90.0  # start slices at 12 o'clock
+    for i, value in enumerate(totals.values()):
+        sweep = 360.0 * float(value) / total
+        draw.pieslice(bbox, angle, angle + sweep,
+                      fill=PIE_COLORS[i % len(PIE_COLORS)], outline='white')
+        angle += sweep
+
+    y = 28 + size - 2 * pad + 10
+    for i, (label, value) in enumerate(totals.items()):
+        draw.rectangle((pad, y + 4, pad + 14, y + 18),
+                       fill=PIE_COLORS[i % len(PIE_COLORS)])
+        pct = 100.0 * float(value) / total
+        draw.text((pad + 20, y + 11), f"{label}: {float(value):.2f} ({pct:.1f}%)",
+                  fill='black', anchor='lm')
+        y += 22
+    return img
+
+def _to_png_buffer(*panels):
+    """Paste chart panels side by side and encode the canvas as PNG."""
+    canvas = Image.new('RGB',
+                       (sum(p.width for p in panels), max(p.height for p in panels)),
+                       'white')
+    x = 0
+    for panel in panels:
+        canvas.paste(panel, (x, 0))
+        x += panel.width
+    buf = BytesIO()
+    canvas.save(buf, format='PNG')
+    buf.seek(0)
+    return buf
+
+def render_report_png(monthly_by_category, yearly_by_category,
+                      current_month, current_year):
+    """Render the monthly/yearly pie charts to a PNG buffer."""
+    monthly = _draw_pie(f'Monthly Expenses ({current_month})',
+                        monthly_by_category, 'No data for current month')
+    yearly = _draw_pie(f'Yearly Expenses ({current_year})',
+                       yearly_by_category, 'No data for current year')
+    return _to_png_buffer(monthly, yearly)
+
+def render_payment_png(payment_dist):
+    """Render the payment-method distribution pie chart to a PNG buffer."""
+    return _to_png_buffer(
+        _draw_pie('Payment Method Distribution', payment_dist, 'No data yet'))
 
 # --- Bot Commands ---
 async def start(update: Update, context: CallbackContext):
@@ -125,58 +464,57 @@ async def handle_message(update: Update, context: CallbackContext):
     """Handle expense entries"""
     message = update.message.text.lower()
     try:
-        parts = message.split()
-        
+        match = EXPENSE_RE.match(message.strip())
+        if not match:
+            await update.message.reply_text(
+                "⚠️ Could not understand that entry.\n\n"
+                "Use format: `category amount description via payment_method`\n"
+                "Example: `food 250 lunch via UPI`",
+                parse_mode='Markdown'
+            )
+            return
+
         # Parse payment method
         payment_method = "Cash"  # Default
-        if 'via' in parts:
-            via_index = parts.index('via')
-            payment_method_raw = ' '.join(parts[via_index+1:]).strip()
-
-            # Case-insensitive comparison
-            for method in PAYMENT_METHODS:
-                if payment_method_raw.lower() == method.lower():
-                    payment_method = method
-                    break
-            else:
-                payment_method = "Other"
-    
-            parts = parts[:via_index]
-        
+        if match['pay']:
+            payment_method = PAYMENT_LOOKUP.get(match['pay'].strip().lower(), "Other")
+
         # Parse date (format: DD/MM or use today)
-        if '/' in parts[0] and len(parts[0].split('/')) == 2:
-            day, month = map(int, parts[0].split('/'))
-            current_year = datetime.now().year
+        now = datetime.now()
+        if match['day']:
+            day, month = int(match['day']), int(match['month'])
             try:
-                expense_date = datetime(current_year, month, day).date()
+                expense_date = datetime(now.year, month, day).date()
             except ValueError:
                 await update.message.reply_text("⚠️ Invalid date format. Use DD/MM")
                 return
-            parts = parts[1:]
         else:
-            expense_date = datetime.now().date()
-        
+            expense_date = now.date()
+
         # Parse category and amount (already in ₹)
-        category = parts[0].title()
-        try:
-            amount = float(parts[1])
-        except ValueError:
-            await update.message.reply_text("⚠️ Invalid amount. Please enter numbers only")
-            return
-            
-        description = ' '.join(parts[2:]) if len(parts) > 2 else ''
+        category = match['cat'].title()
+        amount = float(match['amt'])
+        description = match['desc'] or ''
 
-        # Add to Google Sheets
-        expenses_ws.append_row([
+        # Queue for Google Sheets (flushed in the background)
+        await queue_row(expenses_ws, [
             expense_date.strftime("%Y-%m-%d"),
             category,
             amount,
             description,
             payment_method
         ])
+        await add_to_total('expenses', amount)
+        cache_append(expenses_ws, {
+            "Date": expense_date.strftime("%Y-%m-%d"),
+            "Category": category,
+            "Amount (₹)": amount,
+            "Description": description,
+            "Payment Method": payment_method
+        })
 
         # Calculate and show remaining balance
-        balance = calculate_balance()
+        balance = await calculate_balance()
         response = (
             f"✅ Expense Added:\n"
             f"📅 Date: {expense_date.strftime('%d %b %Y')}\n"
@@ -205,13 +543,20 @@ async def add_salary(update: Update, context: CallbackContext):
         amount = float(context.args[0])
         description = ' '.join(context.args[1:]) if len(context.args) > 1 else 'Monthly Salary'
         
-        salary_ws.append_row([
-            datetime.now().strftime("%Y-%m-%d"),
+        today_str = datetime.now().strftime("%Y-%m-%d")
+        await queue_row(salary_ws, [
+            today_str,
             amount,
             description
         ])
-        
-        balance = calculate_balance()
+        await add_to_total('salary', amount)
+        cache_append(salary_ws, {
+            "Date": today_str,
+            "Amount (₹)": amount,
+            "Description": description
+        })
+
+        balance = await calculate_balance()
         await update.message.reply_text(
             f"💰 Salary Added: ₹{amount:.2f}\n"
             f"📝 {description}\n"
@@ -224,8 +569,8 @@ async def add_salary(update: Update, context: CallbackContext):
 
 async def show_balance(update: Update, context: CallbackContext):
     """Show current balance and spending summary"""
-    balance = calculate_balance()
-    monthly_expenses = get_current_month_expenses()
+    balance = await calculate_balance()
+    monthly_expenses = await get_current_month_expenses()
     
     response = (
         f"💼 *Financial Summary*\n"
@@ -233,18 +578,25 @@ async def show_balance(update: Update, context: CallbackContext):
         f"📅 Month: {datetime.now().strftime('%B %Y')}\n\n"
     )
     
-    if not monthly_expenses.empty:
-        # Monthly spending by category
-        by_category = monthly_expenses.groupby('Category')['Amount (₹)'].sum()
+    if monthly_expenses:
+        # A month of entries is tiny; one pass of dict sums beats the fixed
+        # overhead of two groupby pipelines for a text-only summary.
+        by_category = {}
+        by_payment = {}
+        for category, method, amount in zip(monthly_expenses['Category'],
+                                            monthly_expenses['Payment Method'],
+                                            monthly_expenses['Amount (₹)']):
+            by_category[category] = by_category.get(category, 0) + amount
+            by_payment[method] = by_payment.get(method, 0) + amount
+
+        # Build each section with a single join instead of O(N²) string +=
         response += "📊 *Monthly Expenses by Category:*\n"
-        for category, amount in by_category.items():
-            response += f"- {category}: ₹{amount:.2f}\n"
-        
-        # Monthly spending by payment method
-        by_payment = monthly_expenses.groupby('Payment Method')['Amount (₹)'].sum()
-        response += "\n💳 *Monthly Expenses by Payment Method:*\n"
-        for method, amount in by_payment.items():
-            response += f"- {method}: ₹{amount:.2f}\n"
+        response += "\n".join(f"- {category}: ₹{amount:.2f}"
+                              for category, amount in by_category.items())
+
+        response += "\n\n💳 *Monthly Expenses by Payment Method:*\n"
+        response += "\n".join(f"- {method}: ₹{amount:.2f}"
+                              for method, amount in by_payment.items())
     else:
         response += "No expenses recorded this month yet."
     
@@ -253,53 +605,32 @@ async def show_balance(update: Update, context: CallbackContext):
 async def generate_report(update: Update, context: CallbackContext):
     """Generate monthly/yearly expense reports"""
     try:
-        expense_data = expenses_ws.get_all_records()
-        if not expense_data:
+        cols = await cached_columns(expenses_ws)
+        if not cols:
             await update.message.reply_text("No expenses recorded yet!")
             return
-            
-        df = pd.DataFrame(expense_data)
-        df['Date'] = pd.to_datetime(df['Date'])
-        df['Amount (₹)'] = pd.to_numeric(df['Amount (₹)'])
-        
+
         # Current month and year analysis
-        current_month = datetime.now().strftime("%B %Y")
-        current_year = datetime.now().year
-        
-        monthly_expenses = df[df['Date'].dt.to_period('M') == pd.to_datetime('now').to_period('M')]
-        monthly_by_category = monthly_expenses.groupby('Category')['Amount (₹)'].sum()
-        
-        yearly_expenses = df[df['Date'].dt.year == current_year]
-        yearly_by_category = yearly_expenses.groupby('Category')['Amount (₹)'].sum()
+        now = datetime.now()
+        current_month = now.strftime("%B %Y")
+        current_year = now.year
 
-        # Plotting
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 7))
-        
-        # Monthly Pie Chart
-        if not monthly_by_category.empty:
-            ax1.pie(monthly_by_category, labels=monthly_by_category.index, autopct='%1.1f%%')
-            ax1.set_title(f'Monthly Expenses ({current_month})')
-        else:
-            ax1.text(0.5, 0.5, 'No data\nfor current month', ha='center', va='center')
-        
-        # Yearly Pie Chart
-        if not yearly_by_category.empty:
-            ax2.pie(yearly_by_category, labels=yearly_by_category.index, autopct='%1.1f%%')
-            ax2.set_title(f'Yearly Expenses ({current_year})')
-        else:
-            ax2.text(0.5, 0.5, 'No data\nfor current year', ha='center', va='center')
+        monthly_mask = (cols['Date'].astype('datetime64[M]')
+                        == np.datetime64(now.strftime('%Y-%m')))
+        yearly_mask = (cols['Date'].astype('datetime64[Y]')
+                       == np.datetime64(str(current_year)))
+        monthly_by_category = sum_by_category(cols, monthly_mask)
+        yearly_by_category = sum_by_category(cols, yearly_mask)
 
-        plt.tight_layout()
-        
-        # Save and send the figure
-        buf = BytesIO()
-        plt.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-        buf.seek(0)
-        plt.close()
+        # Render off the event loop so other users aren't blocked
+        buf = await asyncio.get_running_loop().run_in_executor(
+            None, render_report_png,
+            monthly_by_category, yearly_by_category, current_month, current_year
+        )
 
         # Send summary text with the chart
-        monthly_total = monthly_by_category.sum() if not monthly_by_category.empty else 0
-        yearly_total = yearly_by_category.sum() if not yearly_by_category.empty else 0
+        monthly_total = sum(monthly_by_category.values())
+        yearly_total = sum(yearly_by_category.values())
         summary = (
             f"📊 Expense Report (₹)\n\n"
             f"📅 {current_month} Total: ₹{monthly_total:.2f}\n"
@@ -314,26 +645,34 @@ async def generate_report(update: Update, context: CallbackContext):
 async def show_today_expenses(update: Update, context: CallbackContext):
     """Show expenses recorded today"""
     try:
-        expense_data = expenses_ws.get_all_records()
-        if not expense_data:
+        cols = await cached_columns(expenses_ws)
+        if not cols:
             await update.message.reply_text("No expenses recorded yet!")
             return
-            
-        df = pd.DataFrame(expense_data)
-        today = datetime.now().date()
-        df['Date'] = pd.to_datetime(df['Date']).dt.date
-        today_expenses = df[df['Date'] == today]
-        
-        if not today_expenses.empty:
-            response = "📝 Today's Expenses (₹):\n\n"
-            total = 0
-            for _, row in today_expenses.iterrows():
-                response += f"• {row['Category']}: ₹{row['Amount (₹)']:.2f}"
-                if row['Description']:
-                    response += f" ({row['Description']})"
-                response += f" [{row['Payment Method']}]\n"
-                total += row['Amount (₹)']
-            response += f"\n💵 Today's Total: ₹{total:.2f}"
+
+        today = np.datetime64(datetime.now().date())
+        mask = cols['Date'].astype('datetime64[D]') == today
+
+        if mask.any():
+            # Sum the column vectorized and walk plain column arrays instead
+            # of building a row object per entry.
+            amounts = cols['Amount (₹)'][mask]
+            total = amounts.sum()
+            lines = []
+            for category, amount, description, payment in zip(
+                    cols['Category'][mask],
+                    amounts,
+                    cols['Description'][mask],
+                    cols['Payment Method'][mask]):
+                line = f"• {category}: ₹{amount:.2f}"
+                if description:
+                    line += f" ({description})"
+                lines.append(line + f" [{payment}]")
+            response = (
+                "📝 Today's Expenses (₹):\n\n"
+                + "\n".join(lines)
+                + f"\n\n💵 Today's Total: ₹{total:.2f}"
+            )
             await update.message.reply_text(response)
         else:
             await update.message.reply_text("No expenses recorded for today!")
@@ -343,24 +682,18 @@ async def show_today_expenses(update: Update, context: CallbackContext):
 async def payment_method_report(update: Update, context: CallbackContext):
     """Show payment method distribution"""
     try:
-        expense_data = expenses_ws.get_all_records()
-        if not expense_data:
+        cols = await cached_columns(expenses_ws)
+        if not cols:
             await update.message.reply_text("No expenses recorded yet!")
             return
-            
-        df = pd.DataFrame(expense_data)
-        payment_dist = df.groupby('Payment Method')['Amount (₹)'].sum()
-        
-        # Plot
-        plt.figure(figsize=(8, 8))
-        plt.pie(payment_dist, labels=payment_dist.index, autopct='%1.1f%%')
-        plt.title("Payment Method Distribution (₹)")
-        
-        buf = BytesIO()
-        plt.savefig(buf, format='png')
-        buf.seek(0)
-        plt.close()
-        
+
+        payment_dist = sum_by(cols['Payment Method'], cols['Amount (₹)'])
+
+        # Render off the event loop so other users aren't blocked
+        buf = await asyncio.get_running_loop().run_in_executor(
+            None, render_payment_png, payment_dist
+        )
+
         await update.message.reply_photo(
             photo=buf,
             caption="💳 Payment Method Distribution"
@@ -368,10 +701,60 @@ async def payment_method_report(update: Update, context: CallbackContext):
     except Exception as e:
         await update.message.reply_text(f"⚠️ Error: {str(e)}")
 
+async def warm_start():
+    """Pay one-time costs at boot instead of inside the first user request."""
+    await initialize_totals()          # seeds the amount-column caches
+    await cached_columns(expenses_ws)  # cold whole-sheet fetch for the reports
+    # The first PNG encode initializes Pillow's encoder machinery; run it
+    # once on a throwaway chart so the first /report doesn't pay for it.
+    _to_png_buffer(_draw_pie('warmup', {}, ''))
+    # The warm-up fetches above forced a token grab if the cached one had
+    # expired; persist whatever token we hold for the next restart.
+    store_cached_token(credentials)
+
+_flush_task = None  # module-level reference so the task isn't garbage-collected
+
+async def start_background_tasks(application):
+    """Warm caches and start the write flusher once the event loop is running."""
+    global _flush_task
+    await warm_start()
+    # Plain asyncio.create_task: Application.create_task warns (and won't
+    # auto-await the task) when called from post_init, before the
+    # application is started.
+    _flush_task = asyncio.create_task(flush_writes_task())
+
+async def drain_pending_writes(application):
+    """Write out everything still queued before the process exits.
+
+    Users were already told their entries were recorded, so a SIGTERM
+    restart must not drop the rows still buffered between flush cycles
+    (or parked in the queue for retry).
+    """
+    if _flush_task is not None:
+        _flush_task.cancel()
+        try:
+            await _flush_task
+        except asyncio.CancelledError:
+            pass
+    for ws, rows in _drain_queue_batches().items():
+        try:
+            _append_rows(ws, rows)
+        except Exception as e:
+            print(f"Final flush of {len(rows)} rows to {ws.title} failed: {e}")
+
 def main():
     """Start the bot"""
-    application = ApplicationBuilder().token(TELEGRAM_TOKEN).build()
-    
+    # Process updates concurrently: one user's slow report (sheet fetch +
+    # chart render) must not stall everyone else's commands.
+    application = (
+        ApplicationBuilder()
+        .token(TELEGRAM_TOKEN)
+        .concurrent_updates(True)
+        .post_init(start_background_tasks)
+        .post_shutdown(drain_pending_writes)
+        .build()
+    )
+
     # Command Handlers
     application.add_handler(CommandHandler("start", start))
     application.add_handler(CommandHandler("help", start))
@@ -383,7 +766,7 @@ def main():
     
     # Message Handler
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
-    
+
     print("Bot is running...")
     application.run_polling()
 